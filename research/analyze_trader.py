@@ -9,12 +9,13 @@ Usage:
     python analyze_trader.py LEGACY_CSV_IMPORT --days 30
     python analyze_trader.py LEGACY_CSV_IMPORT --db ../trades.db
     python analyze_trader.py --api http://127.0.0.1:8080
+    python analyze_trader.py --engine duckdb --aggregate
 """
 
 import argparse
 import json
-import sqlite3
 import sys
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -25,12 +26,22 @@ except ImportError:
     print("Please install pandas and numpy: pip install pandas numpy", file=sys.stderr)
     sys.exit(1)
 
+from http_client import http_client
+from trades_db import connect_duckdb, connect_readonly, prepare_database
 
-def load_trades_from_db(db_path: str, trader_address: str = None, days: int = None) -> pd.DataFrame:
-    """Load trades from SQLite database."""
-    conn = sqlite3.connect(db_path)
+# Columns read by analyze_trades(); the columnar engine only scans these
+ANALYSIS_COLUMNS = ["timestamp_ms", "token_id", "side", "whale_usd", "our_shares", "status"]
+
+
+def _ms_to_datetime(ms: int) -> datetime:
+    """Convert a millisecond Unix timestamp to a naive UTC datetime."""
+    return datetime(1970, 1, 1) + timedelta(milliseconds=int(ms))
 
-    query = "SELECT * FROM trades"
+
+def _build_filters(
+    trader_address: str = None, days: int = None, ts_col: str = "timestamp_ms"
+) -> tuple[str, list]:
+    """Build the WHERE clause and parameters shared by the DB loaders."""
     conditions = []
     params = []
 
@@ -40,27 +51,185 @@ def load_trades_from_db(db_path: str, trader_address: str = None, days: int = No
 
     if days:
         since_ts = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        conditions.append("timestamp_ms >= ?")
+        conditions.append(f"{ts_col} >= ?")
         params.append(since_ts)
 
     if conditions:
-        query += " WHERE " + " AND ".join(conditions)
+        return " WHERE " + " AND ".join(conditions), params
+    return "", params
 
-    query += " ORDER BY timestamp_ms DESC"
 
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
+def load_trades_from_db(
+    db_path: str, trader_address: str = None, days: int = None, engine: str = "sqlite"
+) -> pd.DataFrame:
+    """Load trades from SQLite database."""
+    if engine == "duckdb":
+        where, params = _build_filters(trader_address, days)
+        query = f"SELECT {', '.join(ANALYSIS_COLUMNS)} FROM trades" + where + " ORDER BY timestamp_ms DESC"
+        con = connect_duckdb(db_path)
+        try:
+            return con.execute(query, params).fetch_df()
+        finally:
+            con.close()
+
+    ts_col = prepare_database(db_path)
+    where, params = _build_filters(trader_address, days, ts_col)
+    query = "SELECT * FROM trades" + where + f" ORDER BY {ts_col} DESC"
+
+    conn = connect_readonly(db_path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def analyze_trades_sql(
+    conn, trader_address: str = None, days: int = None, ts_col: str = "timestamp_ms"
+) -> dict:
+    """
+    Compute the analyze_trades() statistics directly in the database.
+
+    Only the aggregates cross into Python, so no DataFrame is built.
+    Works with both sqlite3 and DuckDB connections. Returns the same
+    schema as analyze_trades().
+    """
+    where, params = _build_filters(trader_address, days, ts_col)
+
+    (
+        total_trades,
+        unique_tokens,
+        buy_trades,
+        sell_trades,
+        total_volume_usd,
+        avg_trade_size,
+        min_ms,
+        max_ms,
+        executed_count,
+    ) = conn.execute(
+        """
+        SELECT
+            COUNT(*),
+            COUNT(DISTINCT token_id),
+            SUM(CASE WHEN side = 'BUY' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN side = 'SELL' THEN 1 ELSE 0 END),
+            SUM(whale_usd),
+            AVG(whale_usd),
+            MIN({ts_col}),
+            MAX({ts_col}),
+            SUM(CASE WHEN our_shares IS NOT NULL THEN 1 ELSE 0 END)
+        FROM trades
+        """.format(ts_col=ts_col) + where,
+        params,
+    ).fetchone()
+
+    if not total_trades:
+        return {"error": "No trades found"}
 
+    status_counts = dict(
+        conn.execute(
+            "SELECT status, COUNT(*) FROM trades" + where + " GROUP BY status ORDER BY COUNT(*) DESC",
+            params,
+        ).fetchall()
+    )
 
-def load_trades_from_api(api_url: str, limit: int = 1000) -> pd.DataFrame:
-    """Load trades from HTTP API."""
-    import httpx
+    execution_rate = executed_count / total_trades * 100
+    first_trade = _ms_to_datetime(min_ms)
+    last_trade = _ms_to_datetime(max_ms)
+    trading_days = (last_trade - first_trade).days + 1
+    trades_per_day = total_trades / trading_days if trading_days > 0 else 0
 
-    response = httpx.get(f"{api_url}/trades", params={"limit": limit})
+    return {
+        "total_trades": total_trades,
+        "unique_tokens": unique_tokens,
+        "buy_trades": buy_trades,
+        "sell_trades": sell_trades,
+        "buy_sell_ratio": buy_trades / sell_trades if sell_trades > 0 else float("inf"),
+        "total_volume_usd": round(total_volume_usd, 2),
+        "avg_trade_size_usd": round(avg_trade_size, 2),
+        "executed_trades": executed_count,
+        "execution_rate_pct": round(execution_rate, 2),
+        "status_breakdown": status_counts,
+        "first_trade": str(first_trade),
+        "last_trade": str(last_trade),
+        "trading_days": trading_days,
+        "trades_per_day": round(trades_per_day, 2),
+    }
+
+
+def fetch_trades_from_api(api_url: str, limit: int = 1000, days: int = None) -> list[dict]:
+    """Fetch raw trade records from HTTP API."""
+    params = {"limit": limit}
+    if days:
+        params["since"] = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
+
+    response = http_client().get(f"{api_url}/trades", params=params)
     response.raise_for_status()
-    trades = response.json()
-    return pd.DataFrame(trades)
+    return response.json()
+
+
+def load_trades_from_api(api_url: str, limit: int = 1000, days: int = None) -> pd.DataFrame:
+    """Load trades from HTTP API."""
+    return pd.DataFrame(fetch_trades_from_api(api_url, limit, days))
+
+
+def analyze_trades_fast(records: list[dict]) -> dict:
+    """
+    Compute the analyze_trades() statistics in one pass over API records.
+
+    Skips building a DataFrame, which dominates the cost for the few
+    thousand records the API returns. Returns the same schema as
+    analyze_trades().
+    """
+    if not records:
+        return {"error": "No trades found"}
+
+    total_trades = len(records)
+    buy_trades = sell_trades = executed_count = 0
+    total_volume_usd = 0.0
+    min_ms = max_ms = records[0]["timestamp_ms"]
+    tokens = set()
+    status_counts = Counter()
+
+    for trade in records:
+        side = trade["side"]
+        if side == "BUY":
+            buy_trades += 1
+        elif side == "SELL":
+            sell_trades += 1
+        total_volume_usd += trade["whale_usd"]
+        ts = trade["timestamp_ms"]
+        if ts < min_ms:
+            min_ms = ts
+        elif ts > max_ms:
+            max_ms = ts
+        tokens.add(trade["token_id"])
+        status_counts[trade["status"]] += 1
+        if trade.get("our_shares") is not None:
+            executed_count += 1
+
+    avg_trade_size = total_volume_usd / total_trades
+    execution_rate = executed_count / total_trades * 100
+    first_trade = _ms_to_datetime(min_ms)
+    last_trade = _ms_to_datetime(max_ms)
+    trading_days = (last_trade - first_trade).days + 1
+    trades_per_day = total_trades / trading_days if trading_days > 0 else 0
+
+    return {
+        "total_trades": total_trades,
+        "unique_tokens": len(tokens),
+        "buy_trades": buy_trades,
+        "sell_trades": sell_trades,
+        "buy_sell_ratio": buy_trades / sell_trades if sell_trades > 0 else float("inf"),
+        "total_volume_usd": round(total_volume_usd, 2),
+        "avg_trade_size_usd": round(avg_trade_size, 2),
+        "executed_trades": executed_count,
+        "execution_rate_pct": round(execution_rate, 2),
+        "status_breakdown": dict(status_counts.most_common()),
+        "first_trade": str(first_trade),
+        "last_trade": str(last_trade),
+        "trading_days": trading_days,
+        "trades_per_day": round(trades_per_day, 2),
+    }
 
 
 def analyze_trades(df: pd.DataFrame) -> dict:
@@ -68,33 +237,31 @@ def analyze_trades(df: pd.DataFrame) -> dict:
     if df.empty:
         return {"error": "No trades found"}
 
-    # Convert timestamp to datetime
-    df["datetime"] = pd.to_datetime(df["timestamp_ms"], unit="ms")
-
     # Basic stats
     total_trades = len(df)
     unique_tokens = df["token_id"].nunique()
 
     # Side distribution
-    buy_trades = len(df[df["side"] == "BUY"])
-    sell_trades = len(df[df["side"] == "SELL"])
+    side_counts = df["side"].value_counts()
+    buy_trades = int(side_counts.get("BUY", 0))
+    sell_trades = int(side_counts.get("SELL", 0))
 
     # Volume stats (using whale data as that's what we observe)
-    total_volume_usd = df["whale_usd"].sum()
-    avg_trade_size = df["whale_usd"].mean()
+    volume = df["whale_usd"].agg(["sum", "mean"])
+    total_volume_usd = float(volume["sum"])
+    avg_trade_size = float(volume["mean"])
 
     # Status distribution
     status_counts = df["status"].value_counts().to_dict()
 
     # Execution stats (trades where our_shares is not null)
-    executed_df = df[df["our_shares"].notna()]
-    executed_count = len(executed_df)
+    executed_count = int(df["our_shares"].notna().sum())
     execution_rate = (executed_count / total_trades * 100) if total_trades > 0 else 0
 
-    # Time analysis
+    # Time analysis (reduce the raw int64 column; convert only the endpoints)
     if not df.empty:
-        first_trade = df["datetime"].min()
-        last_trade = df["datetime"].max()
+        first_trade = _ms_to_datetime(df["timestamp_ms"].min())
+        last_trade = _ms_to_datetime(df["timestamp_ms"].max())
         trading_days = (last_trade - first_trade).days + 1
         trades_per_day = total_trades / trading_days if trading_days > 0 else 0
     else:
@@ -161,6 +328,14 @@ def print_analysis(stats: dict, verbose: bool = False):
             print(f"  {status_short}: {count} ({pct:.1f}%)")
 
 
+def output_stats(stats: dict, args: argparse.Namespace):
+    """Print statistics in the format requested on the command line."""
+    if args.format == "json":
+        print(json.dumps(stats, indent=2))
+    else:
+        print_analysis(stats, args.verbose)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Analyze trader performance from local database"
@@ -198,13 +373,33 @@ def main():
         action="store_true",
         help="Show detailed status breakdown"
     )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Compute statistics in SQL without loading trades into pandas"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sqlite", "duckdb"],
+        default="sqlite",
+        help="Query engine for the database (default: sqlite)"
+    )
 
     args = parser.parse_args()
 
     # Load trades
     if args.api:
         print(f"Loading trades from API: {args.api}", file=sys.stderr)
-        df = load_trades_from_api(args.api)
+        if args.format == "json":
+            # JSON in, JSON out: aggregate the records without pandas
+            records = fetch_trades_from_api(args.api, days=args.days)
+            if args.trader:
+                records = [t for t in records if t["trader_address"] == args.trader]
+            print(f"Loaded {len(records)} trades", file=sys.stderr)
+            output_stats(analyze_trades_fast(records), args)
+            return
+
+        df = load_trades_from_api(args.api, days=args.days)
         if args.trader:
             df = df[df["trader_address"] == args.trader]
     else:
@@ -214,19 +409,29 @@ def main():
             print("Run the bot first or specify correct path with --db", file=sys.stderr)
             sys.exit(1)
 
+        if args.aggregate:
+            print(f"Aggregating trades in: {db_path}", file=sys.stderr)
+            if args.engine == "duckdb":
+                conn = connect_duckdb(str(db_path))
+                ts_col = "timestamp_ms"
+            else:
+                ts_col = prepare_database(str(db_path))
+                conn = connect_readonly(str(db_path))
+            try:
+                stats = analyze_trades_sql(conn, args.trader, args.days, ts_col)
+            finally:
+                conn.close()
+            output_stats(stats, args)
+            return
+
         print(f"Loading trades from: {db_path}", file=sys.stderr)
-        df = load_trades_from_db(str(db_path), args.trader, args.days)
+        df = load_trades_from_db(str(db_path), args.trader, args.days, args.engine)
 
     print(f"Loaded {len(df)} trades", file=sys.stderr)
 
     # Analyze
     stats = analyze_trades(df)
-
-    # Output
-    if args.format == "json":
-        print(json.dumps(stats, indent=2))
-    else:
-        print_analysis(stats, args.verbose)
+    output_stats(stats, args)
 
 
 if __name__ == "__main__":
@@ -8,12 +8,13 @@ from the SQLite database to evaluate potential performance.
 Usage:
     python backtest_strategy.py --db ../trades.db
     python backtest_strategy.py --scale 0.5 --min-shares 10
+    python backtest_strategy.py --engine duckdb
 """
 
 import argparse
 import json
-import sqlite3
 import sys
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 
@@ -24,6 +25,64 @@ except ImportError:
     print("Please install pandas and numpy: pip install pandas numpy", file=sys.stderr)
     sys.exit(1)
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Run the kernel as plain Python when numba is not installed."""
+        return lambda func: func
+
+from trades_db import connect_duckdb, connect_readonly, prepare_database
+
+# Columns read by BacktestEngine.process_chunk()
+BACKTEST_COLUMNS = ["timestamp_ms", "token_id", "side", "whale_shares", "whale_price", "whale_usd"]
+
+# Per-trade decision codes, in filter precedence order
+DECISION_COPY = 0
+DECISION_MIN_SHARES = 1
+DECISION_MAX_POSITION = 2
+DECISION_RANDOM = 3
+
+
+@njit(cache=True)
+def _simulate(whale_shares, whale_usd, token_codes, is_buy, scale, min_sh, max_usd, prob,
+              rng_vals, positions_out, decisions_out):
+    """
+    Evaluate trades one at a time, in order.
+
+    Updates positions_out (indexed by token code) and writes a decision
+    code per trade into decisions_out. Returns (executed, skipped,
+    total_volume_usd). Takes only NumPy arrays and scalars so it compiles
+    under numba; this is the place to add path-dependent rules (e.g. a
+    stop-loss on the running position) that cannot be vectorized.
+    """
+    executed = 0
+    skipped = 0
+    total_vol = 0.0
+    for i in range(whale_shares.shape[0]):
+        our_shares = whale_shares[i] * scale
+        our_usd = whale_usd[i] * scale
+        if our_shares < min_sh:
+            decisions_out[i] = DECISION_MIN_SHARES
+        elif our_usd > max_usd:
+            decisions_out[i] = DECISION_MAX_POSITION
+        elif rng_vals[i] > prob:
+            decisions_out[i] = DECISION_RANDOM
+        else:
+            decisions_out[i] = DECISION_COPY
+            if is_buy[i]:
+                positions_out[token_codes[i]] += our_shares
+            else:
+                positions_out[token_codes[i]] -= our_shares
+            executed += 1
+            total_vol += our_usd
+            continue
+        skipped += 1
+    return executed, skipped, total_vol
+
 
 class BacktestEngine:
     """Simple backtesting engine for copy trading strategies."""
@@ -34,99 +93,120 @@ class BacktestEngine:
         min_shares: float = 10.0,
         max_position_usd: float = 1000.0,
         copy_probability: float = 1.0,
+        sequential: bool = False,
+        log_size: int = 20,
+        seed: int = None,
     ):
         self.scale_ratio = scale_ratio
         self.min_shares = min_shares
         self.max_position_usd = max_position_usd
         self.copy_probability = copy_probability
+        self.sequential = sequential  # Use the per-trade _simulate kernel
+        self.rng = np.random.default_rng(seed)
+
+        # The random filter is skipped entirely at copy_probability >= 1
+        self.uses_rng = copy_probability < 1.0
 
         # State
         self.positions: dict[str, float] = {}  # token_id -> net_shares
         self.trades_executed = 0
         self.trades_skipped = 0
         self.total_volume_usd = 0.0
-        self.entry_prices: dict[str, list] = {}  # token_id -> [(shares, price), ...]
-
-    def should_copy(self, whale_shares: float, whale_usd: float) -> tuple[bool, str]:
-        """Determine if a trade should be copied."""
-        # Scale the trade
-        our_shares = whale_shares * self.scale_ratio
-
-        # Check minimum shares
-        if our_shares < self.min_shares:
-            return False, f"SKIP: {our_shares:.2f} shares < {self.min_shares} minimum"
-
-        # Check max position
-        if whale_usd * self.scale_ratio > self.max_position_usd:
-            return False, f"SKIP: ${whale_usd * self.scale_ratio:.2f} > ${self.max_position_usd} max"
-
-        # Random probability check
-        if np.random.random() > self.copy_probability:
-            return False, f"SKIP: Random probability ({self.copy_probability*100:.0f}%)"
-
-        return True, "COPY"
-
-    def execute_trade(self, token_id: str, side: str, shares: float, price: float, usd: float):
-        """Execute a simulated trade."""
-        scaled_shares = shares * self.scale_ratio
-        scaled_usd = usd * self.scale_ratio
-
-        if side == "BUY":
-            self.positions[token_id] = self.positions.get(token_id, 0) + scaled_shares
-            # Track entry price
-            if token_id not in self.entry_prices:
-                self.entry_prices[token_id] = []
-            self.entry_prices[token_id].append((scaled_shares, price))
-        else:  # SELL
-            self.positions[token_id] = self.positions.get(token_id, 0) - scaled_shares
-
-        self.trades_executed += 1
-        self.total_volume_usd += scaled_usd
-
-    def run_backtest(self, trades_df: pd.DataFrame) -> dict:
-        """Run backtest on historical trades."""
-        # Sort by timestamp
-        trades_df = trades_df.sort_values("timestamp_ms")
-
-        execution_log = []
-
-        for _, row in trades_df.iterrows():
-            whale_shares = row["whale_shares"]
-            whale_usd = row["whale_usd"]
-            whale_price = row["whale_price"]
-            token_id = row["token_id"]
-            side = row["side"]
-
-            should_copy, reason = self.should_copy(whale_shares, whale_usd)
-
-            if should_copy:
-                self.execute_trade(token_id, side, whale_shares, whale_price, whale_usd)
-                execution_log.append({
-                    "timestamp_ms": row["timestamp_ms"],
-                    "token_id": token_id[:20] + "...",
-                    "side": side,
-                    "whale_shares": whale_shares,
-                    "our_shares": whale_shares * self.scale_ratio,
-                    "price": whale_price,
-                    "action": "EXECUTED"
-                })
+        self.total_trades = 0
+        # Last log_size trades; older entries are evicted on append. None keeps all.
+        self.execution_log: deque[dict] = deque(maxlen=log_size)
+
+    def process_chunk(self, trades_df: pd.DataFrame):
+        """
+        Apply a chunk of time-ordered trades to the engine state.
+
+        By default copy/skip decisions are evaluated as boolean masks over
+        the whole chunk and positions are accumulated with a single
+        bincount, so the Python-level work does not grow with the number of
+        trades. With sequential=True the same rules run trade by trade in
+        the compiled _simulate kernel.
+        """
+        n = len(trades_df)
+        if n == 0:
+            return
+
+        whale_shares = trades_df["whale_shares"].to_numpy(dtype=float)
+        whale_usd = trades_df["whale_usd"].to_numpy(dtype=float)
+        is_buy = trades_df["side"].to_numpy() == "BUY"
+
+        # Factorize token ids to int codes so per-token sums are one bincount
+        # pass instead of a dict probe per trade
+        codes, uniques = pd.factorize(trades_df["token_id"].to_numpy(), sort=False)
+
+        scaled = whale_shares * self.scale_ratio
+        scaled_usd = whale_usd * self.scale_ratio
+
+        if self.sequential:
+            # One bulk fill per chunk; with probability 1 every draw passes
+            rng_vals = self.rng.random(n) if self.uses_rng else np.zeros(n)
+            sums = np.zeros(len(uniques))
+            decisions = np.empty(n, dtype=np.int8)
+            executed, skipped, volume = _simulate(
+                whale_shares, whale_usd, codes.astype(np.int64), is_buy,
+                self.scale_ratio, self.min_shares, self.max_position_usd,
+                self.copy_probability, rng_vals, sums, decisions,
+            )
+        else:
+            # Assign in reverse precedence so the first failing check wins
+            decisions = np.full(n, DECISION_COPY, dtype=np.int8)
+            if self.uses_rng:
+                decisions[self.rng.random(n) > self.copy_probability] = DECISION_RANDOM
+            decisions[scaled_usd > self.max_position_usd] = DECISION_MAX_POSITION
+            decisions[scaled < self.min_shares] = DECISION_MIN_SHARES
+            ok = decisions == DECISION_COPY
+
+            signed = np.where(is_buy, scaled, -scaled)
+            signed[~ok] = 0.0
+            sums = np.bincount(codes, weights=signed, minlength=len(uniques))
+            executed = int(ok.sum())
+            skipped = n - executed
+            volume = float(scaled_usd[ok].sum())
+
+        for token_id, shares in zip(uniques, sums.tolist()):
+            self.positions[token_id] = self.positions.get(token_id, 0) + shares
+
+        self.total_trades += n
+        self.trades_executed += int(executed)
+        self.trades_skipped += int(skipped)
+        self.total_volume_usd += float(volume)
+
+        # Only the tail of the log is reported, so only build those rows
+        if self.execution_log.maxlen is None:
+            tail = trades_df
+        else:
+            tail = trades_df.tail(self.execution_log.maxlen)
+        for i, (_, row) in zip(range(n - len(tail), n), tail.iterrows()):
+            decision = decisions[i]
+            if decision == DECISION_COPY:
+                action = "EXECUTED"
+            elif decision == DECISION_MIN_SHARES:
+                action = f"SKIP: {scaled[i]:.2f} shares < {self.min_shares} minimum"
+            elif decision == DECISION_MAX_POSITION:
+                action = f"SKIP: ${scaled_usd[i]:.2f} > ${self.max_position_usd} max"
             else:
-                self.trades_skipped += 1
-                execution_log.append({
-                    "timestamp_ms": row["timestamp_ms"],
-                    "token_id": token_id[:20] + "...",
-                    "side": side,
-                    "whale_shares": whale_shares,
-                    "our_shares": 0,
-                    "price": whale_price,
-                    "action": reason
-                })
-
+                action = f"SKIP: Random probability ({self.copy_probability*100:.0f}%)"
+            self.execution_log.append({
+                "timestamp_ms": row["timestamp_ms"],
+                "token_id": row["token_id"][:20] + "...",
+                "side": row["side"],
+                "whale_shares": row["whale_shares"],
+                "our_shares": scaled[i] if decision == DECISION_COPY else 0,
+                "price": row["whale_price"],
+                "action": action,
+            })
+
+    def results(self) -> dict:
+        """Summarize the trades processed so far."""
         return {
-            "total_whale_trades": len(trades_df),
+            "total_whale_trades": self.total_trades,
             "trades_executed": self.trades_executed,
             "trades_skipped": self.trades_skipped,
-            "execution_rate": self.trades_executed / len(trades_df) * 100 if len(trades_df) > 0 else 0,
+            "execution_rate": self.trades_executed / self.total_trades * 100 if self.total_trades > 0 else 0,
             "total_volume_usd": round(self.total_volume_usd, 2),
             "open_positions": len([p for p in self.positions.values() if abs(p) > 0.0001]),
             "positions": {k: round(v, 4) for k, v in self.positions.items() if abs(v) > 0.0001},
@@ -136,28 +216,60 @@ class BacktestEngine:
                 "max_position_usd": self.max_position_usd,
                 "copy_probability": self.copy_probability,
             },
-            "execution_log": execution_log[-20:],  # Last 20 trades
+            "execution_log": list(self.execution_log),
         }
 
+    def run_backtest(self, trades_df: pd.DataFrame) -> dict:
+        """Run backtest on historical trades held in a single DataFrame."""
+        # Sort by timestamp
+        self.process_chunk(trades_df.sort_values("timestamp_ms"))
+        return self.results()
 
-def load_trades(db_path: str, days: int = None) -> pd.DataFrame:
-    """Load trades from SQLite database."""
-    conn = sqlite3.connect(db_path)
 
-    query = "SELECT * FROM trades"
+def _trades_query(columns: str, ts_col: str, days: int = None) -> tuple[str, list]:
+    """Build the time-ordered trades query for iter_trades()."""
+    query = f"SELECT {columns} FROM trades"
     params = []
 
     if days:
         from datetime import timedelta
         since_ts = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        query += " WHERE timestamp_ms >= ?"
+        query += f" WHERE {ts_col} >= ?"
         params.append(since_ts)
 
-    query += " ORDER BY timestamp_ms ASC"
-
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-    return df
+    query += f" ORDER BY {ts_col} ASC"
+    return query, params
+
+
+def iter_trades(db_path: str, days: int = None, engine: str = "sqlite", chunksize: int = 200_000):
+    """
+    Yield trades from the database in timestamp order, chunksize rows at a time.
+
+    The full history is never materialized, so memory stays bounded by the
+    chunk size regardless of database size.
+    """
+    if engine == "duckdb":
+        query, params = _trades_query(", ".join(BACKTEST_COLUMNS), "timestamp_ms", days)
+        con = connect_duckdb(db_path)
+        try:
+            con.execute(query, params)
+            # fetch_df_chunk() counts in DuckDB vectors of 2048 rows
+            vectors = max(1, chunksize // 2048)
+            while True:
+                chunk = con.fetch_df_chunk(vectors)
+                if chunk.empty:
+                    break
+                yield chunk
+        finally:
+            con.close()
+        return
+
+    query, params = _trades_query("*", prepare_database(db_path), days)
+    conn = connect_readonly(db_path)
+    try:
+        yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+    finally:
+        conn.close()
 
 
 def print_results(results: dict, verbose: bool = False):
@@ -240,6 +352,28 @@ def main():
         default=1.0,
         help="Probability of copying each trade (default: 1.0 = 100%%)"
     )
+    parser.add_argument(
+        "--engine",
+        choices=["sqlite", "duckdb"],
+        default="sqlite",
+        help="Query engine for loading trades (default: sqlite)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed for --probability, for reproducible backtests"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Evaluate trades one at a time in the compiled kernel (numba recommended)"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=200_000,
+        help="Trades read from the database per batch (default: 200000)"
+    )
     parser.add_argument(
         "--format", "-f",
         choices=["text", "json"],
@@ -251,6 +385,11 @@ def main():
         action="store_true",
         help="Show detailed position and trade info"
     )
+    parser.add_argument(
+        "--full-log",
+        action="store_true",
+        help="Keep every trade in the execution log instead of the last 20 (JSON output with -v)"
+    )
 
     args = parser.parse_args()
 
@@ -261,24 +400,30 @@ def main():
         print("Run the bot first or import CSV data.", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Loading trades from: {db_path}", file=sys.stderr)
-    df = load_trades(str(db_path), args.days)
-    print(f"Loaded {len(df)} trades", file=sys.stderr)
-
-    if df.empty:
-        print("No trades found for backtest.", file=sys.stderr)
-        sys.exit(1)
-
     # Run backtest
     engine = BacktestEngine(
         scale_ratio=args.scale,
         min_shares=args.min_shares,
         max_position_usd=args.max_position,
         copy_probability=args.probability,
+        sequential=args.sequential,
+        log_size=None if args.full_log else 20,
+        seed=args.seed,
     )
 
-    print("Running backtest...", file=sys.stderr)
-    results = engine.run_backtest(df)
+    if args.sequential and not HAS_NUMBA:
+        print("numba not installed; sequential kernel runs as plain Python", file=sys.stderr)
+
+    print(f"Running backtest on trades from: {db_path}", file=sys.stderr)
+    for chunk in iter_trades(str(db_path), args.days, args.engine, args.chunksize):
+        engine.process_chunk(chunk)
+    print(f"Processed {engine.total_trades} trades", file=sys.stderr)
+
+    if engine.total_trades == 0:
+        print("No trades found for backtest.", file=sys.stderr)
+        sys.exit(1)
+
+    results = engine.results()
 
     # Output
     if args.format == "json":
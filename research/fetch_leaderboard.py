@@ -18,6 +18,8 @@ from datetime import datetime
 
 import httpx
 
+from http_client import http_client
+
 # Polymarket leaderboard API endpoint
 LEADERBOARD_API = "https://polymarket.com/api/leaderboard"
 
@@ -33,27 +35,26 @@ def fetch_leaderboard(limit: int = 50) -> list[dict]:
         List of trader dictionaries with address and stats
     """
     try:
-        with httpx.Client(timeout=30) as client:
-            # Try the leaderboard endpoint
-            response = client.get(
-                LEADERBOARD_API,
-                params={"limit": limit, "period": "all"}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            traders = []
-            for rank, trader in enumerate(data.get("leaderboard", [])[:limit], 1):
-                traders.append({
-                    "rank": rank,
-                    "address": trader.get("address", ""),
-                    "username": trader.get("username", ""),
-                    "profit_loss": trader.get("profitLoss", 0),
-                    "volume": trader.get("volume", 0),
-                    "positions": trader.get("positions", 0),
-                    "win_rate": trader.get("winRate", 0),
-                })
-            return traders
+        # Try the leaderboard endpoint
+        response = http_client().get(
+            LEADERBOARD_API,
+            params={"limit": limit, "period": "all"}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        traders = []
+        for rank, trader in enumerate(data.get("leaderboard", [])[:limit], 1):
+            traders.append({
+                "rank": rank,
+                "address": trader.get("address", ""),
+                "username": trader.get("username", ""),
+                "profit_loss": trader.get("profitLoss", 0),
+                "volume": trader.get("volume", 0),
+                "positions": trader.get("positions", 0),
+                "win_rate": trader.get("winRate", 0),
+            })
+        return traders
 
     except httpx.HTTPStatusError as e:
         print(f"Error fetching leaderboard: HTTP {e.response.status_code}", file=sys.stderr)
@@ -90,10 +91,13 @@ def output_table(traders: list[dict]):
         if not traders:
             return
         headers = list(traders[0].keys())
-        print(" | ".join(headers))
-        print("-" * (len(" | ".join(headers))))
-        for trader in traders:
-            print(" | ".join(str(trader[h]) for h in headers))
+        # Stringify every cell once, then size columns and emit all lines
+        rows = [[str(trader[h]) for h in headers] for trader in traders]
+        widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(headers)]
+        header_line = " | ".join(h.ljust(w) for h, w in zip(headers, widths))
+        lines = [header_line, "-" * len(header_line)]
+        lines.extend(" | ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows)
+        print("\n".join(lines))
 
 
 def main():
@@ -0,0 +1,29 @@
+"""
+Shared HTTP client for the research scripts that call Polymarket APIs.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def http_client():
+    """
+    Return the process-wide httpx client, created on first use.
+
+    Repeated requests reuse pooled connections instead of paying a TCP +
+    TLS handshake each time. Uses HTTP/2 when h2 is installed. httpx is
+    imported here so scripts that only read the database do not need it.
+    """
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
@@ -0,0 +1,185 @@
+"""
+Shared database helpers for the research scripts.
+
+The bot writes trades to SQLite. These helpers open that same file for
+read-heavy analytics, optionally through DuckDB's columnar engine.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Tuning for the analytics connection: serve pages from mmap and a 256 MiB
+# page cache instead of pread() calls, keep temp B-trees in RAM, and refuse
+# writes. The bot already runs the database in WAL mode, so readers do not
+# block it.
+READONLY_PRAGMAS = [
+    "PRAGMA mmap_size = 30000000000",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = 1",
+]
+
+# Bumped whenever ensure_indexes() gains a new index
+RESEARCH_SCHEMA_VERSION = 1
+
+# Indexes serving the research loaders' WHERE/ORDER BY patterns. The bot's
+# schema creates these too; older databases may predate them.
+RESEARCH_INDEXES = [
+    # WHERE trader_address = ? [AND timestamp_ms >= ?] ORDER BY timestamp_ms
+    "CREATE INDEX IF NOT EXISTS idx_trades_trader_ts ON trades(trader_address, timestamp_ms DESC)",
+    # WHERE timestamp_ms >= ? ORDER BY timestamp_ms
+    "CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp_ms DESC)",
+]
+
+
+def ensure_indexes(conn: sqlite3.Connection):
+    """
+    Create the indexes used by the research queries, once per database.
+
+    ``PRAGMA user_version`` records that this has run so later loads skip
+    the DDL entirely. If the database is not writable a warning is printed
+    and the queries run without the indexes.
+    """
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version >= RESEARCH_SCHEMA_VERSION:
+        return
+
+    try:
+        for statement in RESEARCH_INDEXES:
+            conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {RESEARCH_SCHEMA_VERSION}")
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        # Read-only snapshot or a file owned by the bot user: query unindexed
+        conn.rollback()
+        print(f"Warning: could not create research indexes ({e}), continuing without them", file=sys.stderr)
+
+
+def _table_columns(conn: sqlite3.Connection) -> dict[str, str]:
+    """Map trades column names to their upper-cased declared types."""
+    return {row[1]: row[2].upper() for row in conn.execute("PRAGMA table_info(trades)")}
+
+
+def _has_integer_affinity(decltype: str) -> bool:
+    """SQLite gives INTEGER affinity to any declared type containing "INT"."""
+    return "INT" in decltype
+
+
+def timestamp_column(conn: sqlite3.Connection) -> str:
+    """
+    Return the trades column to use for timestamp comparisons and ordering.
+
+    The bot's schema declares ``timestamp_ms INTEGER``. If a database was
+    created without INTEGER affinity (e.g. TEXT, by an external import),
+    every range comparison would cast per row and could not use the
+    indexes. In that case an INTEGER shadow column ``timestamp_ms_int`` is
+    added once, backfilled, indexed and kept current by an insert trigger,
+    and its name is returned instead. If the database cannot be written, a
+    per-row CAST expression is returned so comparisons stay numeric.
+    """
+    columns = _table_columns(conn)
+    if _has_integer_affinity(columns.get("timestamp_ms", "")):
+        return "timestamp_ms"
+    if "timestamp_ms_int" in columns:
+        return "timestamp_ms_int"
+
+    print(
+        f"Warning: trades.timestamp_ms is declared {columns.get('timestamp_ms') or 'untyped'}, "
+        "adding INTEGER column timestamp_ms_int",
+        file=sys.stderr,
+    )
+    try:
+        conn.execute("ALTER TABLE trades ADD COLUMN timestamp_ms_int INTEGER")
+        conn.execute("UPDATE trades SET timestamp_ms_int = CAST(timestamp_ms AS INTEGER)")
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trades_timestamp_ms_int AFTER INSERT ON trades
+            BEGIN
+                UPDATE trades SET timestamp_ms_int = CAST(NEW.timestamp_ms AS INTEGER)
+                WHERE rowid = NEW.rowid;
+            END
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trades_trader_ts_int ON trades(trader_address, timestamp_ms_int DESC)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp_int ON trades(timestamp_ms_int DESC)")
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Warning: could not add timestamp_ms_int ({e}), casting timestamp_ms per row", file=sys.stderr)
+        return "CAST(timestamp_ms AS INTEGER)"
+
+    return "timestamp_ms_int"
+
+
+def _needs_migration(conn: sqlite3.Connection) -> bool:
+    """True if ensure_indexes() or timestamp_column() would write."""
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version < RESEARCH_SCHEMA_VERSION:
+        return True
+    columns = _table_columns(conn)
+    return not _has_integer_affinity(columns.get("timestamp_ms", "")) and "timestamp_ms_int" not in columns
+
+
+def prepare_database(db_path: str) -> str:
+    """
+    Apply one-time schema fixes (indexes, timestamp typing) to the database.
+
+    The database is inspected read-only first; a writable connection is
+    only opened when a fix is actually pending. If the writes fail, the
+    helpers warn and the loaders fall back to unindexed queries. Returns
+    the timestamp column or expression to query, see timestamp_column().
+    """
+    conn = connect_readonly(db_path)
+    try:
+        if not _needs_migration(conn):
+            return timestamp_column(conn)
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_indexes(conn)
+        return timestamp_column(conn)
+    finally:
+        conn.close()
+
+
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+    """
+    Open the trades database read-only for analytical scans.
+
+    Uses a ``mode=ro`` URI so the OS can share the mapping with other
+    readers, and applies READONLY_PRAGMAS.
+    """
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    for pragma in READONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect_duckdb(db_path: str):
+    """
+    Open the bot's SQLite database through DuckDB.
+
+    The file is attached with DuckDB's sqlite extension and made the default
+    catalog, so queries can keep referring to the ``trades`` table. DuckDB
+    only reads the columns a query references and hands results to pandas
+    as columnar batches instead of converting row by row.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        print("Please install duckdb for --engine duckdb: pip install duckdb", file=sys.stderr)
+        sys.exit(1)
+
+    con = duckdb.connect()
+    con.execute("INSTALL sqlite")
+    con.execute("LOAD sqlite")
+    # ATTACH does not accept bound parameters, so quote the path literal
+    quoted = db_path.replace("'", "''")
+    con.execute(f"ATTACH '{quoted}' AS t (TYPE SQLITE, READ_ONLY)")
+    con.execute("USE t")
+    return con
@@ -5,9 +5,9 @@ Debug script to output exact EIP-712 signing data for comparison with Rust.
 
 import os
 import json
-from dotenv import load_dotenv
+from envfile import load_env_file
 
-load_dotenv()
+load_env_file()
 
 from eth_account import Account
 from py_order_utils.builders import OrderBuilder
@@ -15,8 +15,14 @@ from py_order_utils.signer import Signer
 from py_order_utils.model.order import Order, OrderData
 from py_order_utils.model.sides import BUY
 from py_order_utils.model.signatures import EOA
-from poly_eip712_structs import make_domain
+from eth_abi import encode
 from eth_utils import keccak
+from fast_clob import DOMAIN_TYPE_HASH, domain_separator
+
+try:
+    from coincurve import PrivateKey
+except ImportError:
+    PrivateKey = None
 
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 if not PRIVATE_KEY.startswith("0x"):
@@ -32,16 +38,81 @@ SALT = 124398945
 MAKER_AMOUNT = 1000000
 TAKER_AMOUNT = 2970000
 
+# The EIP-712 order type string is constant; hash it once. The domain
+# separator comes from fast_clob, shared with the order test scripts.
+ORDER_TYPE_STR = "Order(uint256 salt,address maker,address signer,address taker,uint256 tokenId,uint256 makerAmount,uint256 takerAmount,uint256 expiration,uint256 nonce,uint256 feeRateBps,uint8 side,uint8 signatureType)"
+_ORDER_TYPE_HASH = keccak(ORDER_TYPE_STR.encode())
+_DOMAIN_SEPARATOR = domain_separator(CHAIN_ID, EXCHANGE)
+
+
+# Order members in type-string order, with their ABI encodings. Encoding
+# with a fixed type list skips building the EIP712Struct type tree per call.
+_ORDER_FIELDS = (
+    "salt", "maker", "signer", "taker", "tokenId", "makerAmount", "takerAmount",
+    "expiration", "nonce", "feeRateBps", "side", "signatureType",
+)
+_ORDER_ABI_TYPES = (
+    "bytes32", "uint256", "address", "address", "address", "uint256", "uint256",
+    "uint256", "uint256", "uint256", "uint256", "uint8", "uint8",
+)
+
+
+def order_struct_hash(order) -> bytes:
+    """EIP-712 hashStruct(order) for an Order or a dict with the same keys."""
+    return keccak(encode(_ORDER_ABI_TYPES, (_ORDER_TYPE_HASH, *(order[k] for k in _ORDER_FIELDS))))
+
+
+def signable_bytes(order, domain_sep: bytes = _DOMAIN_SEPARATOR) -> bytes:
+    """
+    Equivalent of order.signable_bytes(domain) using the precomputed domain
+    separator and order type hash.
+    """
+    return b"\x19\x01" + domain_sep + order_struct_hash(order)
+
+
+def encode_order(order, domain_sep: bytes = _DOMAIN_SEPARATOR) -> bytes:
+    """32-byte EIP-712 digest of an order, ready for ECDSA signing."""
+    return keccak(signable_bytes(order, domain_sep))
+
+
+class CoincurveSigner(Signer):
+    """
+    Signer that does the ECDSA step in libsecp256k1 via coincurve.
+
+    Same interface and output as py_order_utils' Signer (65-byte r||s||v
+    hex, v in {27, 28}), but signs the 32-byte digest directly instead of
+    going through eth_account.
+    """
+
+    def __init__(self, key: str):
+        super().__init__(key)
+        self._pk = PrivateKey(bytes.fromhex(key[2:] if key.startswith("0x") else key))
+
+    def sign(self, struct_hash) -> str:
+        if isinstance(struct_hash, str):
+            struct_hash = bytes.fromhex(struct_hash[2:] if struct_hash.startswith("0x") else struct_hash)
+        sig = self._pk.sign_recoverable(struct_hash, hasher=None)
+        return (sig[:64] + bytes([sig[64] + 27])).hex()
+
+
+def make_signer(key: str) -> Signer:
+    """Prefer the libsecp256k1-backed signer when coincurve is installed."""
+    if PrivateKey is not None:
+        return CoincurveSigner(key)
+    return Signer(key)
+
+
 def main():
     print("=" * 70)
     print("EIP-712 Signing Debug")
     print("=" * 70)
 
     # Create signer
-    signer = Signer(PRIVATE_KEY)
+    signer = make_signer(PRIVATE_KEY)
     maker_address = signer.address()
 
     print(f"\nWallet address: {maker_address}")
+    print(f"Signer: {type(signer).__name__}")
     print(f"Chain ID: {CHAIN_ID}")
     print(f"Exchange: {EXCHANGE}")
 
@@ -77,14 +148,6 @@ def main():
     print(f"  side:          {order['side']}")
     print(f"  signatureType: {order['signatureType']}")
 
-    # Create domain separator (matching Python library)
-    domain = make_domain(
-        name="Polymarket CTF Exchange",
-        version="1",
-        chainId=str(CHAIN_ID),
-        verifyingContract=EXCHANGE,
-    )
-
     print("\n" + "-" * 70)
     print("Domain:")
     print("-" * 70)
@@ -92,10 +155,11 @@ def main():
     print(f"  version:           1")
     print(f"  chainId:           {CHAIN_ID}")
     print(f"  verifyingContract: {EXCHANGE}")
+    print(f"  separator:         0x{_DOMAIN_SEPARATOR.hex()}")
 
     # Get signable bytes and hash
-    signable = order.signable_bytes(domain=domain)
-    struct_hash = keccak(signable)
+    signable = signable_bytes(order)
+    struct_hash = encode_order(order)
 
     print("\n" + "-" * 70)
     print("Hashes:")
@@ -105,18 +169,12 @@ def main():
     print(f"  Struct hash (0x):     0x{struct_hash.hex()}")
 
     # Sign it
-    signature = signer.sign("0x" + struct_hash.hex())
+    signature = signer.sign(struct_hash)
     print(f"\n  Signature: 0x{signature}")
 
-    # Also show the type hash for Order
-    order_type_str = "Order(uint256 salt,address maker,address signer,address taker,uint256 tokenId,uint256 makerAmount,uint256 takerAmount,uint256 expiration,uint256 nonce,uint256 feeRateBps,uint8 side,uint8 signatureType)"
-    order_type_hash = keccak(order_type_str.encode())
-    print(f"\n  Order type hash: 0x{order_type_hash.hex()}")
-
-    # Domain type hash
-    domain_type_str = "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
-    domain_type_hash = keccak(domain_type_str.encode())
-    print(f"  Domain type hash: 0x{domain_type_hash.hex()}")
+    # Also show the type hashes for Order and the domain
+    print(f"\n  Order type hash: 0x{_ORDER_TYPE_HASH.hex()}")
+    print(f"  Domain type hash: 0x{DOMAIN_TYPE_HASH.hex()}")
 
     print("\n" + "=" * 70)
     print("Use these values to compare with Rust implementation")
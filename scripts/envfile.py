@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Minimal .env reader for the helper scripts.
+
+The scripts only need a couple of variables (PRIVATE_KEY, PROXY_WALLET),
+so this replaces python-dotenv's parser with a single pass over the file.
+"""
+
+import codecs
+import os
+import re
+from pathlib import Path
+
+_INLINE_COMMENT = re.compile(r"\s+#")
+
+# A quoted value ends at its closing quote; anything after it (usually an
+# inline comment) is ignored. Escapes are decoded like python-dotenv does.
+_DOUBLE_QUOTED = re.compile(r'"((?:\\.|[^"\\])*)"')
+_SINGLE_QUOTED = re.compile(r"'((?:\\'|[^'])*)'")
+_DOUBLE_QUOTE_ESCAPES = re.compile(r"\\[\\'\"abfnrtv]")
+_SINGLE_QUOTE_ESCAPES = re.compile(r"\\[\\']")
+
+
+def _decode_escapes(pattern: re.Pattern, value: str) -> str:
+    return pattern.sub(lambda m: codecs.decode(m.group(0), "unicode-escape"), value)
+
+
+def _parse_value(value: str) -> str:
+    """Unquote a raw value, or strip the inline comment from an unquoted one."""
+    match = _DOUBLE_QUOTED.match(value)
+    if match:
+        return _decode_escapes(_DOUBLE_QUOTE_ESCAPES, match.group(1))
+    match = _SINGLE_QUOTED.match(value)
+    if match:
+        return _decode_escapes(_SINGLE_QUOTE_ESCAPES, match.group(1))
+    return _INLINE_COMMENT.split(value, 1)[0]
+
+
+def find_env_file(name: str = ".env") -> Path:
+    """
+    Return the nearest .env in this directory or a parent, like
+    python-dotenv's find_dotenv(). Returns None if there is none.
+    """
+    here = Path(__file__).resolve().parent
+    for directory in (here, *here.parents):
+        candidate = directory / name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def load_env_file(path: Path = None) -> None:
+    """
+    Copy KEY=VALUE lines from the .env file into os.environ.
+
+    Variables already set in the environment win, as with load_dotenv().
+    Comment lines, an ``export`` prefix, inline `` # comments`` and quoted
+    values (with backslash escapes) are handled; values are not
+    interpolated.
+    """
+    path = path or find_env_file()
+    if path is None:
+        return
+
+    # utf-8-sig drops the BOM some editors write (see .env.example)
+    for line in path.read_text(encoding="utf-8-sig").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        os.environ.setdefault(key, _parse_value(value.strip()))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Shared py_clob_client setup for the order test scripts.
+
+Mirrors what the Rust bot does in build_worker_state(): the private key is
+normalized once when the client is built, and the pooled HTTP/2 connection
+to the CLOB is opened before the first signed request, so the timed calls
+do not pay DNS + TCP + TLS setup.
+"""
+
+import asyncio
+import json
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from eth_abi import encode
+from eth_utils import keccak
+from poly_eip712_structs import make_domain
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType, PostOrdersArgs
+from py_clob_client.constants import POLYGON
+from py_clob_client.exceptions import PolyApiException
+from py_order_utils.builders.base_builder import BaseBuilder
+from py_order_utils.utils import prepend_zx
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+CLOB_API_BASE = "https://clob.polymarket.com"
+
+# Most orders the CLOB accepts in one POST /orders request
+MAX_BATCH_ORDERS = 15
+
+# Shared with the Rust bot, which reads and writes the same file
+CREDS_PATH = Path(".clob_creds.json")
+
+# Packed copy of CREDS_PATH for the Python scripts: API key (UUID), secret
+# (base64) and passphrase (hex), each NUL-padded to a fixed width
+CREDS_BIN_PATH = Path(".clob_creds.bin")
+_CREDS_FIELD_SIZES = (36, 44, 64)
+_CREDS_LAYOUT = struct.Struct("".join(f"{size}s" for size in _CREDS_FIELD_SIZES))
+
+DOMAIN_TYPE_HASH = keccak(b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+
+
+@lru_cache(maxsize=None)
+def domain_separator(chain_id: int, exchange: str) -> bytes:
+    """EIP-712 domain separator for a (chainId, verifyingContract) pair."""
+    return keccak(encode(
+        ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+        [DOMAIN_TYPE_HASH, keccak(b"Polymarket CTF Exchange"), keccak(b"1"), chain_id, exchange],
+    ))
+
+
+@lru_cache(maxsize=None)
+def _domain_struct(chain_id: int, verifying_contract: str):
+    return make_domain(
+        name="Polymarket CTF Exchange",
+        version="1",
+        chainId=str(chain_id),
+        verifyingContract=verifying_contract,
+    )
+
+
+def _cached_get_domain_separator(self, chain_id: int, verifying_contract: str):
+    return _domain_struct(chain_id, verifying_contract)
+
+
+def _cached_create_struct_hash(self, order) -> str:
+    separator = domain_separator(int(self.chain_id), self.contract_address)
+    return prepend_zx(keccak(b"\x19\x01" + separator + order.hash_struct()).hex())
+
+
+def install_domain_cache():
+    """
+    Cache the EIP-712 domain in py_order_utils' order builder.
+
+    py_clob_client builds a fresh OrderBuilder for every create_order().
+    Each one defines a new EIP712Domain struct class via make_domain() and
+    re-hashes it when signing, although the domain only depends on the
+    chain and exchange. This replaces two private BaseBuilder methods for
+    the whole process, so it is opt-in: scripts that compare against the
+    reference signing code must not call it.
+    """
+    BaseBuilder._get_domain_separator = _cached_get_domain_separator
+    BaseBuilder._create_struct_hash = _cached_create_struct_hash
+
+
+def normalize_key(private_key: str) -> str:
+    """Return the private key with the 0x prefix eth_account expects."""
+    private_key = private_key.strip()
+    if not private_key.startswith("0x"):
+        private_key = "0x" + private_key
+    return private_key
+
+
+def make_client(private_key: str, host: str = CLOB_API_BASE, chain_id: int = POLYGON) -> ClobClient:
+    """Build a level 1 (signing) CLOB client from a raw or 0x-prefixed key."""
+    return ClobClient(host=host, key=normalize_key(private_key), chain_id=chain_id)
+
+
+def prewarm_connections(client: ClobClient) -> bool:
+    """
+    Open the CLOB connection with an unauthenticated health check.
+
+    py_clob_client sends every request through one module-level HTTP/2
+    client, so later calls reuse this connection. Returns False if the
+    server could not be reached; the caller's first real request will
+    then report the error.
+    """
+    try:
+        client.get_ok()
+        return True
+    except PolyApiException:
+        return False
+
+
+def _write_private(path: Path, data: bytes):
+    """Write an owner-only file via a temp file and rename, so a reader never sees it partial."""
+    tmp = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_packed_creds(path: Path, bin_path: Path) -> Optional[ApiCreds]:
+    """Credentials from bin_path, or None if it is missing, malformed or older than path."""
+    try:
+        if bin_path.stat().st_mtime_ns < path.stat().st_mtime_ns:
+            return None
+        fields = _CREDS_LAYOUT.unpack(bin_path.read_bytes())
+    except (FileNotFoundError, struct.error):
+        return None
+    api_key, api_secret, api_passphrase = (field.rstrip(b"\0").decode() for field in fields)
+    return ApiCreds(api_key=api_key, api_secret=api_secret, api_passphrase=api_passphrase)
+
+
+def _write_packed_creds(creds: ApiCreds, bin_path: Path):
+    fields = [creds.api_key.encode(), creds.api_secret.encode(), creds.api_passphrase.encode()]
+    if any(len(field) > size for field, size in zip(fields, _CREDS_FIELD_SIZES)):
+        # Unexpected format; struct would truncate, so keep using the JSON
+        return
+    _write_private(bin_path, _CREDS_LAYOUT.pack(*fields))
+
+
+def load_or_derive_creds(client: ClobClient, path: Path = CREDS_PATH, bin_path: Path = CREDS_BIN_PATH) -> ApiCreds:
+    """
+    Load cached API credentials, deriving and saving them only when missing.
+
+    Deriving costs an L1-signed HTTPS round-trip, so the caches are tried
+    first: the fixed-layout bin_path, unpacked with a single struct call,
+    then the JSON file it mirrors. The JSON stays the source of truth the
+    Rust bot reads; bin_path is rebuilt whenever it is missing or older.
+    Both the Rust field names (apiKey/secret/passphrase) and the older
+    Python ones (api_key/api_secret/api_passphrase) are read; new files
+    are written in the Rust format, owner-readable only.
+    """
+    creds = _read_packed_creds(path, bin_path)
+    if creds is not None:
+        return creds
+
+    try:
+        data = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        creds = client.derive_api_key()
+        if creds is None:
+            raise RuntimeError("CLOB returned no API credentials")
+        payload = {"apiKey": creds.api_key, "secret": creds.api_secret, "passphrase": creds.api_passphrase}
+        _write_private(path, json.dumps(payload, indent=2).encode())
+    else:
+        creds = ApiCreds(
+            api_key=data.get("apiKey") or data["api_key"],
+            api_secret=data.get("secret") or data["api_secret"],
+            api_passphrase=data.get("passphrase") or data["api_passphrase"],
+        )
+
+    _write_packed_creds(creds, bin_path)
+    return creds
+
+
+async def prepare_client(client: ClobClient, token_id: str) -> tuple[ApiCreds, bool]:
+    """
+    Run the setup requests an order needs concurrently.
+
+    Loads or derives the API credentials while fetching the tick size,
+    neg-risk flag and fee rate that create_order() looks up (the client
+    caches them), alongside the connection prewarm. py_clob_client is
+    synchronous, so each call runs in a worker thread; the total wait is
+    the slowest request instead of the sum. Returns the credentials and
+    whether the prewarm health check succeeded.
+    """
+    healthy, creds, *_ = await asyncio.gather(
+        asyncio.to_thread(prewarm_connections, client),
+        asyncio.to_thread(load_or_derive_creds, client),
+        asyncio.to_thread(client.get_tick_size, token_id),
+        asyncio.to_thread(client.get_neg_risk, token_id),
+        asyncio.to_thread(client.get_fee_rate_bps, token_id),
+    )
+    return creds, healthy
+
+
+def run(coro):
+    """Run coro on uvloop when it is installed, otherwise on asyncio's default loop."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+secp256k1 backend check shared by the scripts that sign orders or
+transactions. Depends only on eth_keys, so importing it does not pull in
+py_clob_client or web3.
+"""
+
+import sys
+
+from eth_keys.backends import CoinCurveECCBackend, get_backend
+
+
+def check_signing_backend() -> bool:
+    """
+    Warn if signatures would be computed in pure Python.
+
+    eth_account signs through eth_keys, which uses libsecp256k1 via
+    coincurve when it is importable (ECC_BACKEND_CLASS overrides this) and
+    otherwise falls back to a much slower pure-Python implementation.
+    """
+    if isinstance(get_backend(), CoinCurveECCBackend):
+        return True
+    print("Warning: signing with the pure-Python secp256k1 backend, pip install coincurve", file=sys.stderr)
+    return False
@@ -5,14 +5,16 @@ Test with EXACT same parameters as the Rust bot failed with.
 
 import os
 import json
-from dotenv import load_dotenv
+from envfile import load_env_file
 
-load_dotenv()
+load_env_file()
 
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import OrderArgs, OrderType
 from py_clob_client.constants import POLYGON
 
+from fast_clob import load_or_derive_creds
+
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 if not PRIVATE_KEY.startswith("0x"):
     PRIVATE_KEY = "0x" + PRIVATE_KEY
@@ -39,19 +41,8 @@ def main():
     print(f"\nWallet: {client.get_address()}")
 
     # Load or derive API creds
-    try:
-        creds = client.derive_api_key()
-        client.set_api_creds(creds)
-    except:
-        with open(".clob_creds.json") as f:
-            creds_data = json.load(f)
-        from py_clob_client.clob_types import ApiCreds
-        creds = ApiCreds(
-            api_key=creds_data["api_key"],
-            api_secret=creds_data["api_secret"],
-            api_passphrase=creds_data["api_passphrase"],
-        )
-        client.set_api_creds(creds)
+    creds = load_or_derive_creds(client)
+    client.set_api_creds(creds)
 
     print(f"API Key: {creds.api_key[:20]}...")
 
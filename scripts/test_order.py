@@ -4,70 +4,70 @@ Minimal Python test to verify Polymarket order signing.
 Uses py_clob_client to compare with our Rust implementation.
 """
 
+import argparse
 import os
-import json
-from dotenv import load_dotenv
 
-load_dotenv()
+# Load credentials; the .env is only read when the key is not exported
+if not os.environ.get("PRIVATE_KEY"):
+    from envfile import load_env_file
+    load_env_file()
 
-from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import OrderArgs, OrderType
-from py_clob_client.constants import POLYGON
-
-# Load credentials
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 if not PRIVATE_KEY:
     print("ERROR: PRIVATE_KEY not set in .env")
     exit(1)
 
-# Ensure 0x prefix
-if not PRIVATE_KEY.startswith("0x"):
-    PRIVATE_KEY = "0x" + PRIVATE_KEY
-
-CLOB_API_BASE = "https://clob.polymarket.com"
-
 # The token ID from the last failed order
 TOKEN_ID = "79003893007240922565581139363959835619617307306268940540301817825959399270354"
 
 def main():
+    # py_clob_client pulls in web3 and the signing stack, so it is imported
+    # only once the key check has passed
+    from fast_clob import (
+        MAX_BATCH_ORDERS,
+        OrderArgs,
+        OrderType,
+        PostOrdersArgs,
+        install_domain_cache,
+        make_client,
+        prepare_client,
+        run,
+    )
+    from signing_backend import check_signing_backend
+
+    parser = argparse.ArgumentParser(description="Sign and submit test orders with py_clob_client")
+    parser.add_argument(
+        "--n",
+        type=int,
+        default=1,
+        help=f"Number of orders to sign and submit; more than one goes through the batch endpoint, "
+             f"{MAX_BATCH_ORDERS} orders per request (default: 1)",
+    )
+    args = parser.parse_args()
+    if args.n < 1:
+        parser.error("--n must be at least 1")
+
     print("=" * 60)
     print("Python CLOB Client Test")
     print("=" * 60)
 
     # Create client
     print("\n1. Creating client...")
-    client = ClobClient(
-        host=CLOB_API_BASE,
-        key=PRIVATE_KEY,
-        chain_id=POLYGON,
-    )
+    check_signing_backend()
+    install_domain_cache()
+    client = make_client(PRIVATE_KEY)
 
     # Show derived address
     print(f"   Wallet address: {client.get_address()}")
 
-    # Get or create API credentials
+    # Get or create API credentials, prewarming the connection and
+    # fetching the market info create_order() needs at the same time
     print("\n2. Getting API credentials...")
-    try:
-        creds = client.derive_api_key()
-        print(f"   API Key: {creds.api_key[:20]}...")
-        client.set_api_creds(creds)
-    except Exception as e:
-        print(f"   Error deriving API key: {e}")
-        # Try loading from file
-        if os.path.exists(".clob_creds.json"):
-            print("   Trying to load from .clob_creds.json...")
-            with open(".clob_creds.json") as f:
-                creds_data = json.load(f)
-            from py_clob_client.clob_types import ApiCreds
-            creds = ApiCreds(
-                api_key=creds_data["api_key"],
-                api_secret=creds_data["api_secret"],
-                api_passphrase=creds_data["api_passphrase"],
-            )
-            client.set_api_creds(creds)
-            print(f"   Loaded API Key: {creds.api_key[:20]}...")
-        else:
-            raise
+    creds, healthy = run(prepare_client(client, TOKEN_ID))
+    if not healthy:
+        print("   Warning: CLOB health check failed")
+    client.set_api_creds(creds)
+    print(f"   API Key: {creds.api_key[:20]}...")
 
     # Create a minimal test order
     print("\n3. Creating test order...")
@@ -75,33 +75,49 @@ def main():
     print(f"   Side: BUY")
     print(f"   Price: 0.34")
     print(f"   Size: 3.0 (=$1.02)")
-
-    order_args = OrderArgs(
-        token_id=TOKEN_ID,
-        price=0.34,
-        size=3.0,
-        side="BUY",
-    )
-
-    # Create signed order
+    if args.n > 1:
+        print(f"   Orders: {args.n}")
+
+    order_args = [
+        OrderArgs(
+            token_id=TOKEN_ID,
+            price=0.34,
+            size=3.0,
+            side="BUY",
+        )
+        for _ in range(args.n)
+    ]
+
+    # Create signed orders; each gets its own salt
     print("\n4. Signing order...")
     try:
-        signed_order = client.create_order(order_args)
+        signed_orders = [client.create_order(a) for a in order_args]
         print(f"   Order created successfully!")
-        print(f"   Signature: {signed_order.signature[:40]}...")
+        for signed_order in signed_orders:
+            print(f"   Signature: {signed_order.signature[:40]}...")
         # Print all attributes
-        print(f"   Order dict: {signed_order.dict()}")
+        print(f"   Order dict: {signed_orders[0].dict()}")
     except Exception as e:
         print(f"   Error creating order: {e}")
         import traceback
         traceback.print_exc()
         raise
 
-    # Submit the order
+    # Submit the orders: one order uses POST /order, more use the batch
+    # endpoint so N orders cost one request per MAX_BATCH_ORDERS
     print("\n5. Submitting order (FAK)...")
     try:
-        response = client.post_order(signed_order, OrderType.FAK)
-        print(f"   Response: {response}")
+        if len(signed_orders) == 1:
+            response = client.post_order(signed_orders[0], OrderType.FAK)
+            print(f"   Response: {response}")
+        else:
+            for start in range(0, len(signed_orders), MAX_BATCH_ORDERS):
+                batch = [
+                    PostOrdersArgs(order=signed_order, orderType=OrderType.FAK)
+                    for signed_order in signed_orders[start:start + MAX_BATCH_ORDERS]
+                ]
+                response = client.post_orders(batch)
+                print(f"   Response ({len(batch)} orders): {response}")
     except Exception as e:
         print(f"   Error submitting order: {e}")
         # Print full error details if available
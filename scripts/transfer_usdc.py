@@ -3,13 +3,31 @@
 Transfer USDC.e from EOA wallet to Polymarket proxy wallet.
 """
 
+import asyncio
 import os
 import sys
-from dotenv import load_dotenv
-from eth_account import Account
-from web3 import Web3
-
-load_dotenv()
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+import httpx
+import requests
+from envfile import load_env_file
+from eth_abi import decode, encode
+from eth_keys import keys
+from eth_utils import keccak
+from signing_backend import check_signing_backend
+from web3 import AsyncWeb3, Web3, WebSocketProvider
+from web3.exceptions import TimeExhausted, TransactionNotFound, Web3RPCError
+from web3.providers.rpc.utils import check_if_retry_on_failure
+
+try:
+    # Compiled drop-in for eth_utils.to_checksum_address
+    from cchecksum import to_checksum_address
+except ImportError:
+    to_checksum_address = Web3.to_checksum_address
+
+load_env_file()
 
 # Polygon RPCs (fallbacks)
 POLYGON_RPCS = [
@@ -18,36 +36,262 @@ POLYGON_RPCS = [
     "https://polygon-rpc.com",
 ]
 
+# Per-endpoint timeout while probing POLYGON_RPCS at startup
+RPC_PROBE_TIMEOUT = 3
+
+# WebSocket endpoint used to wait for confirmation: new block headers are
+# pushed, so the receipt is fetched once per block instead of polled.
+# Set POLYGON_WSS_URL to override, or to an empty value to always poll.
+POLYGON_WSS = os.getenv("POLYGON_WSS_URL", "wss://polygon-bor-rpc.publicnode.com")
+
 # USDC.e contract on Polygon
-USDC_ADDRESS = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
-
-# ERC20 ABI (minimal - just what we need)
-ERC20_ABI = [
-    {
-        "constant": True,
-        "inputs": [{"name": "_owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "balance", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": False,
-        "inputs": [
-            {"name": "_to", "type": "address"},
-            {"name": "_value", "type": "uint256"}
-        ],
-        "name": "transfer",
-        "outputs": [{"name": "", "type": "bool"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [{"name": "", "type": "uint8"}],
-        "type": "function"
-    }
-]
+USDC_ADDRESS = to_checksum_address("0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174")
+
+# Gas limit for a plain USDC.e transfer. Polygon transfers use ~52k gas to
+# an existing holder and ~65k to a new one; the limit only caps the fee,
+# unused gas is not charged.
+GAS_LIMIT_USDC_TRANSFER = 90_000
+
+# Node rejections that mean the gas limit itself was wrong. Any other
+# rejection (nonce too low, already known, insufficient funds, ...) is not
+# fixed by re-estimating gas.
+GAS_LIMIT_ERRORS = ("intrinsic gas too low", "gas limit", "out of gas")
+
+# ERC-20 function selectors, hashed once. Both calls used here take only
+# static arguments, so their calldata is the selector followed by 32-byte
+# words and is built without the contract ABI machinery.
+BALANCE_OF_SELECTOR = keccak(b"balanceOf(address)")[:4]
+TRANSFER_SELECTOR = keccak(b"transfer(address,uint256)")[:4]
+
+
+def _address_word(address: str) -> bytes:
+    return bytes.fromhex(address[2:]).rjust(32, b"\0")
+
+
+def balance_of_call(address: str) -> dict:
+    """eth_call transaction reading the USDC.e balance of address."""
+    data = BALANCE_OF_SELECTOR + _address_word(address)
+    return {'to': USDC_ADDRESS, 'data': "0x" + data.hex()}
+
+
+def read_usdc_balance(w3, address: str) -> int:
+    return int.from_bytes(w3.eth.call(balance_of_call(address)), "big")
+
+
+# Multicall3 is deployed at the same address on every EVM chain. One
+# aggregate3() eth_call runs several balanceOf reads in a single request.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = keccak(b"aggregate3((address,bool,bytes)[])")[:4]
+
+
+def balances_call(addresses: list[str]) -> dict:
+    """eth_call transaction reading the USDC.e balances of addresses via Multicall3."""
+    calls = [(USDC_ADDRESS, False, BALANCE_OF_SELECTOR + _address_word(a)) for a in addresses]
+    data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls])
+    return {'to': MULTICALL3_ADDRESS, 'data': "0x" + data.hex()}
+
+
+def decode_balances(result: bytes) -> list[int]:
+    """Decode aggregate3()'s (success, returnData)[] into balances."""
+    (results,) = decode(["(bool,bytes)[]"], result)
+    return [int.from_bytes(return_data, "big") for _, return_data in results]
+
+
+def read_balances(w3, addresses: list[str]) -> list[int]:
+    """USDC.e balances of addresses, in order, from a single eth_call."""
+    return decode_balances(w3.eth.call(balances_call(addresses)))
+
+
+def transfer_data(to: str, amount: int) -> str:
+    """Calldata for USDC.e transfer(to, amount)."""
+    return "0x" + (TRANSFER_SELECTOR + _address_word(to) + amount.to_bytes(32, "big")).hex()
+
+
+@lru_cache(maxsize=None)
+def _rpc_client() -> httpx.Client:
+    """
+    HTTP client shared by every H2Provider, so connections stay pooled
+    across providers and threads. Uses HTTP/2 when h2 is installed.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+    )
+
+
+class H2Provider(Web3.HTTPProvider):
+    """
+    HTTPProvider that posts JSON-RPC through the shared httpx client.
+
+    web3's requests sessions are cached per thread, so the connection the
+    startup probe opened would not be reused by the main thread. With one
+    pooled client, the winning probe leaves a warm (TLS-established)
+    connection behind for the transfer's own calls.
+    """
+
+    def __init__(self, endpoint_uri: str, timeout: float = 30):
+        super().__init__(endpoint_uri)
+        self.timeout = timeout
+
+    def _post(self, request_data: bytes) -> bytes:
+        # Raise the exception types web3's retry configuration lists
+        try:
+            response = _rpc_client().post(
+                self.endpoint_uri,
+                content=request_data,
+                headers=self.get_request_headers(),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        except httpx.HTTPStatusError as e:
+            raise requests.HTTPError(str(e)) from e
+        return response.content
+
+    def _make_request(self, method, request_data: bytes) -> bytes:
+        # Same retry policy as HTTPProvider._make_request: read-only methods
+        # in the allowlist are retried with exponential backoff
+        config = self.exception_retry_configuration
+        if config is None or not check_if_retry_on_failure(method, config.method_allowlist):
+            return self._post(request_data)
+        for attempt in range(config.retries):
+            try:
+                return self._post(request_data)
+            except tuple(config.errors):
+                if attempt == config.retries - 1:
+                    raise
+                time.sleep(config.backoff_factor * 2 ** attempt)
+
+    def make_batch_request(self, batch_requests):
+        response = self.decode_rpc_response(self._post(self.encode_batch_rpc_request(batch_requests)))
+        if not isinstance(response, list):
+            # The endpoint answered the whole batch with a single error
+            return response
+        return sorted(response, key=lambda r: r["id"])
+
+
+def _probe_rpc(rpc: str) -> bool:
+    w3 = Web3(H2Provider(rpc, timeout=RPC_PROBE_TIMEOUT))
+    return w3.is_connected()
+
+
+def connect_polygon():
+    """
+    Connect to the fastest healthy RPC in POLYGON_RPCS.
+
+    All endpoints are probed at once, so a dead endpoint costs at most
+    RPC_PROBE_TIMEOUT instead of delaying the ones listed after it.
+    Returns None if none of them respond.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(POLYGON_RPCS))
+    try:
+        futures = {pool.submit(_probe_rpc, rpc): rpc for rpc in POLYGON_RPCS}
+        for future in as_completed(futures):
+            if future.exception() is None and future.result():
+                rpc = futures[future]
+                print(f"Connected to: {rpc}")
+                return Web3(H2Provider(rpc))
+    finally:
+        # Don't wait on the slower probes
+        pool.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+def read_account_state(w3, address: str, proxy: str) -> tuple[int, int, int, int, int]:
+    """
+    Return (usdc_balance, proxy_usdc_balance, matic_balance, nonce,
+    gas_price), the balances and nonce being those of address.
+
+    Both USDC.e balances come from one Multicall3 eth_call, sent in the
+    same JSON-RPC batch as the other reads: one round-trip in total.
+    Endpoints that reject batches are read with individual calls.
+    """
+    try:
+        with w3.batch_requests() as batch:
+            batch.add(w3.eth.call(balances_call([address, proxy])))
+            batch.add(w3.eth.get_balance(address))
+            batch.add(w3.eth.get_transaction_count(address))
+            batch.add(w3.eth.gas_price)
+            balances, matic_balance, nonce, gas_price = batch.execute()
+        usdc_balance, proxy_balance = decode_balances(balances)
+    except Exception:
+        usdc_balance, proxy_balance = read_balances(w3, [address, proxy])
+        matic_balance = w3.eth.get_balance(address)
+        nonce = w3.eth.get_transaction_count(address)
+        gas_price = w3.eth.gas_price
+    return usdc_balance, proxy_balance, matic_balance, nonce, gas_price
+
+
+def wait_receipt(w3, tx_hash, timeout: float = 120):
+    """
+    Wait for a transaction receipt, polling with backoff.
+
+    Polygon produces a block roughly every 2 s, so polling starts at 0.5 s
+    and backs off to 3 s instead of web3's fixed 0.1 s interval, which
+    mostly re-asks for blocks that do not exist yet.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.5
+    while True:
+        try:
+            return w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+        if time.monotonic() + delay > deadline:
+            raise TimeExhausted(f"Transaction {tx_hash.hex()} not in a block after {timeout} seconds")
+        time.sleep(delay)
+        delay = min(delay * 1.3, 3.0)
+
+
+async def _wait_receipt_ws(tx_hash):
+    # One connection attempt: if it fails, polling takes over right away
+    provider = WebSocketProvider(
+        POLYGON_WSS,
+        websocket_kwargs={'open_timeout': RPC_PROBE_TIMEOUT},
+        max_connection_retries=1,
+    )
+    async with AsyncWeb3(provider) as w3ws:
+        await w3ws.eth.subscribe("newHeads")
+        # The transaction may have been mined before the subscription started
+        try:
+            return await w3ws.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            pass
+        async for _ in w3ws.socket.process_subscriptions():
+            try:
+                return await w3ws.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+
+
+def wait_for_receipt(w3, tx_hash, timeout: float = 120):
+    """
+    Wait for a transaction receipt, checking once per new block.
+
+    Blocks arrive through a newHeads subscription on POLYGON_WSS. If no
+    WebSocket endpoint is set or it cannot be reached, falls back to
+    polling over HTTP with wait_receipt() for the remaining time.
+    """
+    if POLYGON_WSS:
+        start = time.monotonic()
+        try:
+            return asyncio.run(asyncio.wait_for(_wait_receipt_ws(tx_hash), timeout))
+        except asyncio.TimeoutError:
+            raise TimeExhausted(f"Transaction {tx_hash.hex()} not in a block after {timeout} seconds")
+        except Exception as e:
+            print(f"  WebSocket unavailable ({e}), polling instead")
+            timeout -= time.monotonic() - start
+    return wait_receipt(w3, tx_hash, timeout)
+
 
 def main():
     # Get private key
@@ -65,19 +309,16 @@ def main():
         print("ERROR: PROXY_WALLET not set in .env")
         print("       Set it to your Polymarket proxy wallet address")
         sys.exit(1)
+    # Checksum once; this also rejects a malformed address before any RPC work
+    try:
+        PROXY_WALLET = to_checksum_address(PROXY_WALLET)
+    except ValueError:
+        print(f"ERROR: PROXY_WALLET is not a valid address: {PROXY_WALLET}")
+        sys.exit(1)
 
-    # Connect to Polygon (try multiple RPCs)
-    w3 = None
-    for rpc in POLYGON_RPCS:
-        try:
-            w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={'timeout': 30}))
-            if w3.is_connected():
-                print(f"Connected to: {rpc}")
-                break
-        except Exception:
-            continue
-
-    if not w3 or not w3.is_connected():
+    # Connect to Polygon (race all RPCs, first healthy wins)
+    w3 = connect_polygon()
+    if w3 is None:
         print("ERROR: Cannot connect to any Polygon RPC")
         sys.exit(1)
 
@@ -85,28 +326,30 @@ def main():
     print("USDC.e Transfer Tool")
     print("=" * 60)
 
-    # Get account from private key
-    account = Account.from_key(private_key)
-    eoa_address = account.address
+    # Derive the sender address with eth_keys; eth_account is only needed
+    # to sign, which happens after the balance checks and confirmation
+    check_signing_backend()
+    eoa_address = keys.PrivateKey(bytes.fromhex(private_key[2:])).public_key.to_checksum_address()
 
     print(f"\nFrom (EOA):  {eoa_address}")
     print(f"To (Proxy):  {PROXY_WALLET}")
 
-    # Get USDC contract
-    usdc = w3.eth.contract(address=Web3.to_checksum_address(USDC_ADDRESS), abi=ERC20_ABI)
-
     # Check balances
     print("\n" + "-" * 60)
     print("Balances:")
     print("-" * 60)
 
+    # Balances, plus the nonce and gas price for the transaction
+    usdc_balance, proxy_balance, matic_balance, nonce, gas_price = read_account_state(
+        w3, eoa_address, PROXY_WALLET
+    )
+
     # USDC balance
-    usdc_balance = usdc.functions.balanceOf(eoa_address).call()
     usdc_human = usdc_balance / 1_000_000  # USDC has 6 decimals
     print(f"  USDC.e balance: ${usdc_human:.2f} ({usdc_balance} raw)")
+    print(f"  Proxy USDC.e:   ${proxy_balance / 1_000_000:.2f}")
 
     # MATIC balance (for gas)
-    matic_balance = w3.eth.get_balance(eoa_address)
     matic_human = w3.from_wei(matic_balance, 'ether')
     print(f"  MATIC balance:  {matic_human:.4f} MATIC")
 
@@ -139,50 +382,61 @@ def main():
     # Build transaction
     print("\nBuilding transaction...")
 
-    nonce = w3.eth.get_transaction_count(eoa_address)
-    gas_price = w3.eth.gas_price
+    # The transfer is a fixed selector plus two words of calldata, so the
+    # transaction is assembled by hand instead of through a contract object
+    data = transfer_data(PROXY_WALLET, usdc_balance)
 
-    # Estimate gas for transfer
-    transfer_tx = usdc.functions.transfer(
-        Web3.to_checksum_address(PROXY_WALLET),
-        usdc_balance
-    )
-
-    gas_estimate = transfer_tx.estimate_gas({'from': eoa_address})
-    gas_limit = int(gas_estimate * 1.2)  # 20% buffer
+    # Fixed limit instead of an eth_estimateGas round-trip
+    gas_limit = GAS_LIMIT_USDC_TRANSFER
 
     print(f"  Nonce: {nonce}")
     print(f"  Gas price: {w3.from_wei(gas_price, 'gwei'):.1f} gwei")
     print(f"  Gas limit: {gas_limit}")
 
-    # Build the transaction
-    tx = transfer_tx.build_transaction({
+    tx = {
+        'type': 2,
         'chainId': 137,  # Polygon
+        'to': USDC_ADDRESS,
+        'value': 0,
+        'data': data,
         'gas': gas_limit,
         'maxFeePerGas': gas_price * 2,
-        'maxPriorityFeePerGas': w3.to_wei(30, 'gwei'),
+        'maxPriorityFeePerGas': Web3.to_wei(30, 'gwei'),
         'nonce': nonce,
-    })
+    }
 
     # Sign transaction
     print("\nSigning transaction...")
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
+    from eth_account import Account
+    signed_tx = Account.sign_transaction(tx, private_key)
 
     # Send transaction
     print("Sending transaction...")
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    try:
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Web3RPCError as e:
+        if not any(reason in str(e).lower() for reason in GAS_LIMIT_ERRORS):
+            raise
+        # Rejected before inclusion, so the nonce is still free: estimate
+        # the gas this transfer really needs and send it again
+        print(f"  Rejected with the fixed gas limit ({e}), estimating gas...")
+        gas_estimate = w3.eth.estimate_gas({'from': eoa_address, 'to': USDC_ADDRESS, 'data': data})
+        tx['gas'] = int(gas_estimate * 1.2)  # 20% buffer
+        print(f"  Gas limit: {tx['gas']}")
+        signed_tx = Account.sign_transaction(tx, private_key)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     print(f"  TX Hash: {tx_hash.hex()}")
 
     # Wait for confirmation
     print("Waiting for confirmation...")
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+    receipt = wait_for_receipt(w3, tx_hash, timeout=120)
 
     if receipt.status == 1:
         print(f"\n✅ Transfer successful!")
         print(f"   TX: https://polygonscan.com/tx/{tx_hash.hex()}")
 
         # Check new balance
-        new_balance = usdc.functions.balanceOf(Web3.to_checksum_address(PROXY_WALLET)).call()
+        new_balance = read_usdc_balance(w3, PROXY_WALLET)
         print(f"   Proxy wallet new USDC.e balance: ${new_balance / 1_000_000:.2f}")
     else:
         print(f"\n❌ Transaction failed!")
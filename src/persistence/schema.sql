@@ -47,6 +47,7 @@ CREATE INDEX IF NOT EXISTS idx_trades_trader ON trades(trader_address);
 CREATE INDEX IF NOT EXISTS idx_trades_token ON trades(token_id);
 CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);
 CREATE INDEX IF NOT EXISTS idx_trades_trader_token ON trades(trader_address, token_id);
+CREATE INDEX IF NOT EXISTS idx_trades_trader_ts ON trades(trader_address, timestamp_ms DESC);
 
 -- Positions view: Aggregated current positions by token
 -- This is a VIEW, not a table, calculated on-demand from trades